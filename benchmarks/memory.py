@@ -0,0 +1,120 @@
+"""Compare memory usage of a full feed load with and without a shared `IdPool`.
+
+Both variants load the same structures, so the difference is only due to interning ids in the
+pool (and the memory of the pool itself).
+
+pygtfslib has to be importable, e.g. after `pip install -e .` (see README). Usage:
+
+    python benchmarks/memory.py [GTFS_DIRECTORY]
+
+If no directory is given, a synthetic feed is generated in a temporary directory.
+Each variant is measured in a fresh interpreter so that module-level caches filled by one
+variant are not counted against it.
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+from pygtfslib.interning import IdPool
+from pygtfslib.spatial import read_shapes
+from pygtfslib.temporal import (
+    read_calendar,
+    read_frequency_timedeltas,
+    read_stop_times,
+    TripOpDayProvider,
+)
+
+
+def write_synthetic_feed(directory, n_trips=20_000, n_stops=2_000, n_services=200):
+    rng = random.Random(0)
+    with open(os.path.join(directory, "calendar.txt"), "w") as f:
+        f.write(
+            "service_id,monday,tuesday,wednesday,thursday,friday,saturday,sunday,"
+            "start_date,end_date\n"
+        )
+        for i in range(n_services):
+            days = ",".join(rng.choice("01") for _ in range(7))
+            f.write(f"service_{i},{days},20230101,20231231\n")
+    with open(os.path.join(directory, "trips.txt"), "w") as f:
+        f.write("route_id,service_id,trip_id,shape_id\n")
+        for i in range(n_trips):
+            f.write(
+                f"route_{i % 100},service_{i % n_services},trip_{i},shape_{i % 500}\n"
+            )
+    with open(os.path.join(directory, "stop_times.txt"), "w") as f:
+        f.write("trip_id,stop_sequence,arrival_time,departure_time,stop_id\n")
+        for i in range(n_trips):
+            start = rng.randrange(5 * 3600, 22 * 3600)
+            for seq in range(rng.randrange(5, 30)):
+                t = start + seq * 120
+                hms = f"{t // 3600:02d}:{t // 60 % 60:02d}:{t % 60:02d}"
+                f.write(f"trip_{i},{seq},{hms},{hms},stop_{rng.randrange(n_stops)}\n")
+    with open(os.path.join(directory, "shapes.txt"), "w") as f:
+        f.write("shape_id,shape_pt_sequence,shape_pt_lat,shape_pt_lon\n")
+        for i in range(500):
+            for seq in range(50):
+                f.write(f"shape_{i},{seq},{47 + seq / 1000},{8 + seq / 1000}\n")
+
+
+def load_feed(directory, id_pool):
+    calendar = read_calendar(directory, id_pool=id_pool)
+    provider = TripOpDayProvider({}, id_pool=id_pool)
+    provider.load_directories(directory)
+    frequencies = read_frequency_timedeltas(directory, id_pool=id_pool)
+    stop_times = read_stop_times(directory, id_pool=id_pool)
+    try:
+        shapes = read_shapes(directory, factory=list, id_pool=id_pool)
+    except FileNotFoundError:
+        shapes = {}
+    return calendar, provider, frequencies, stop_times, shapes
+
+
+def measure(directory, use_pool):
+    tracemalloc.start()
+    id_pool = IdPool() if use_pool else None
+    loaded = load_feed(directory, id_pool)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del loaded
+    return current, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "directory", nargs="?", help="directory of an unzipped GTFS feed"
+    )
+    parser.add_argument("--use-pool", choices=["0", "1"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.use_pool is not None:
+        # child process: measure a single variant
+        current, peak = measure(args.directory, args.use_pool == "1")
+        print(current, peak)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.directory
+        if directory is None:
+            write_synthetic_feed(tmp)
+            directory = tmp
+        for use_pool in (False, True):
+            output = subprocess.run(
+                [sys.executable, __file__, directory, f"--use-pool={int(use_pool)}"],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            current, peak = map(int, output.split())
+            label = "shared IdPool" if use_pool else "no IdPool"
+            print(
+                f"{label:>14}: retained {current / 2**20:8.1f} MiB, "
+                f"peak {peak / 2**20:8.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,429 @@
+from array import array
+import csv
+import datetime
+import hashlib
+from functools import lru_cache
+import itertools
+import json
+import logging
+import math
+import os
+import pickle
+import tempfile
+import time
+import typing
+from operator import attrgetter
+
+from .fast_csv import iter_byte_range_as_namedtuples
+from .interning import IdPool
+from .temporal import StopTime, STOP_TIMES_OPTIONAL_FIELDNAMES
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+MANIFEST_FILENAME = "manifest.json"
+# temporary files are only written at the end of a chunk, so this is very conservative
+STALE_TMP_SECONDS = 3600
+# sentinel for missing times in integer columns (GTFS times are never negative)
+_MISSING_SECONDS = -1
+
+
+class ChunkManifest(typing.NamedTuple):
+    """Plan for chunked ingestion of a CSV file.
+
+    Chunk `i` covers the bytes `boundaries[i]` up to (excluding) `boundaries[i + 1]`.
+    All boundaries are at the start of a line. `size` and `mtime_ns` identify the version of the
+    file the plan was made for.
+    """
+
+    filename: str
+    size: int
+    mtime_ns: int
+    chunk_size: int
+    fieldnames: typing.Tuple[str, ...]
+    boundaries: typing.Tuple[int, ...]
+
+    @property
+    def n_chunks(self) -> int:
+        return len(self.boundaries) - 1
+
+    @property
+    def fingerprint(self) -> str:
+        """Short hash identifying this plan, chunks are only valid for their plan."""
+        data = json.dumps(self._asdict(), sort_keys=True).encode()
+        return hashlib.sha1(data).hexdigest()[:16]
+
+
+class StopTimeColumns:
+    """Parsed stop times of one chunk in columnar form.
+
+    Times are stored as seconds with -1 for missing values and missing distances as NaN.
+    """
+
+    __slots__ = (
+        "trip_id",
+        "stop_sequence",
+        "arrival_time",
+        "departure_time",
+        "stop_id",
+        "stop_headsign",
+        "pickup_type",
+        "drop_off_type",
+        "shape_dist_traveled",
+        "timepoint",
+    )
+
+    trip_id: typing.List[str]
+    stop_sequence: "array[int]"
+    arrival_time: "array[int]"
+    departure_time: "array[int]"
+    stop_id: typing.List[str]
+    stop_headsign: typing.List[typing.Optional[str]]
+    pickup_type: "array[int]"
+    drop_off_type: "array[int]"
+    shape_dist_traveled: "array[float]"
+    timepoint: "array[int]"
+
+    def __init__(self) -> None:
+        self.trip_id = []
+        self.stop_sequence = array("q")
+        self.arrival_time = array("q")
+        self.departure_time = array("q")
+        self.stop_id = []
+        self.stop_headsign = []
+        self.pickup_type = array("q")
+        self.drop_off_type = array("q")
+        self.shape_dist_traveled = array("d")
+        self.timepoint = array("q")
+
+    def __len__(self) -> int:
+        return len(self.trip_id)
+
+    def append(self, stop_time: StopTime) -> None:
+        self.trip_id.append(stop_time.trip_id)
+        self.stop_sequence.append(stop_time.stop_sequence)
+        self.arrival_time.append(_timedelta_to_seconds(stop_time.arrival_time))
+        self.departure_time.append(_timedelta_to_seconds(stop_time.departure_time))
+        self.stop_id.append(stop_time.stop_id)
+        self.stop_headsign.append(stop_time.stop_headsign)
+        self.pickup_type.append(stop_time.pickup_type)
+        self.drop_off_type.append(stop_time.drop_off_type)
+        distance = stop_time.shape_dist_traveled
+        self.shape_dist_traveled.append(math.nan if distance is None else distance)
+        self.timepoint.append(stop_time.timepoint)
+
+    def iter_stop_times(
+        self,
+        str_cache: typing.Callable[[typing.Any], typing.Any] = lambda s: s,
+        id_cache: typing.Optional[typing.Callable[[str], str]] = None,
+        trip_ids: typing.Optional[typing.AbstractSet[str]] = None,
+    ) -> typing.Iterator[StopTime]:
+        """Iterate over the stop times of this chunk as `StopTime` instances.
+
+        `str_cache` and `id_cache` have the same meaning as for `StopTime`.
+        `trip_ids` is an optional set for selecting only specific trip ids. Other rows are
+        skipped before any of their strings are passed to the caches.
+        """
+        if id_cache is None:
+            id_cache = str_cache
+        for (
+            trip_id,
+            stop_sequence,
+            arrival_time,
+            departure_time,
+            stop_id,
+            stop_headsign,
+            pickup_type,
+            drop_off_type,
+            shape_dist_traveled,
+            timepoint,
+        ) in zip(
+            self.trip_id,
+            self.stop_sequence,
+            self.arrival_time,
+            self.departure_time,
+            self.stop_id,
+            self.stop_headsign,
+            self.pickup_type,
+            self.drop_off_type,
+            self.shape_dist_traveled,
+            self.timepoint,
+        ):
+            if trip_ids is not None and trip_id not in trip_ids:
+                continue
+            yield StopTime.from_values(
+                trip_id=id_cache(trip_id),
+                stop_sequence=stop_sequence,
+                arrival_time=_seconds_to_timedelta(arrival_time),
+                departure_time=_seconds_to_timedelta(departure_time),
+                stop_id=id_cache(stop_id),
+                stop_headsign=str_cache(stop_headsign),
+                pickup_type=pickup_type,
+                drop_off_type=drop_off_type,
+                shape_dist_traveled=(
+                    None if math.isnan(shape_dist_traveled) else shape_dist_traveled
+                ),
+                timepoint=timepoint,
+            )
+
+
+def _timedelta_to_seconds(value: typing.Optional[datetime.timedelta]) -> int:
+    if value is None:
+        return _MISSING_SECONDS
+    return value.days * 86400 + value.seconds
+
+
+# we cache at least 24 * 60 minutes, like `parse_timedelta`
+@lru_cache(maxsize=2048)
+def _seconds_to_timedelta(value: int) -> typing.Optional[datetime.timedelta]:
+    if value == _MISSING_SECONDS:
+        return None
+    return datetime.timedelta(seconds=value)
+
+
+def _find_line_start(handle: typing.BinaryIO, offset: int) -> int:
+    """Return the position of the first line starting at or after `offset`."""
+    handle.seek(offset - 1)
+    handle.readline()
+    return handle.tell()
+
+
+def plan_chunks(
+    directory: str, filename: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> ChunkManifest:
+    """Split a CSV file into byte ranges of roughly `chunk_size` bytes aligned to lines.
+
+    Attention: Line alignment assumes that quoted fields do not contain line breaks.
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size has to be > 0 (got {chunk_size})")
+    path = os.path.join(directory, filename)
+    stat = os.stat(path)
+    with open(path, "rb") as handle:
+        header = handle.readline()
+        boundaries = [handle.tell()]
+        while True:
+            offset = boundaries[-1] + chunk_size
+            if offset >= stat.st_size:
+                break
+            boundary = _find_line_start(handle, offset)
+            if boundary >= stat.st_size:
+                break
+            boundaries.append(boundary)
+        boundaries.append(stat.st_size)
+    fieldnames = next(csv.reader([header.decode("utf-8-sig")], strict=True))
+    return ChunkManifest(
+        filename,
+        stat.st_size,
+        stat.st_mtime_ns,
+        chunk_size,
+        tuple(fieldnames),
+        tuple(boundaries),
+    )
+
+
+def parse_stop_times_chunk(
+    directory: str, manifest: ChunkManifest, index: int
+) -> StopTimeColumns:
+    """Parse chunk `index` of stop_times.txt into columns."""
+    columns = StopTimeColumns()
+    # strings are only interned within the chunk which shrinks the pickled output
+    str_cache = lru_cache(maxsize=None)(lambda s: s)
+    for row in iter_byte_range_as_namedtuples(
+        directory,
+        manifest.filename,
+        manifest.fieldnames,
+        manifest.boundaries[index],
+        manifest.boundaries[index + 1],
+        optional_fieldnames=STOP_TIMES_OPTIONAL_FIELDNAMES,
+    ):
+        columns.append(StopTime(row, str_cache))
+    return columns
+
+
+def _chunk_path(checkpoint_dir: str, manifest: ChunkManifest, index: int) -> str:
+    return os.path.join(
+        checkpoint_dir, f"chunk-{manifest.fingerprint}-{index:06d}.pickle"
+    )
+
+
+def _write_atomically(path: str, data: bytes) -> None:
+    # a unique temporary file per writer, parallel workers may write the same path
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), prefix=f"{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with open(fd, "wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _remove_stale_tmp_files(checkpoint_dir: str) -> None:
+    """Remove temporary files left behind by writers that were killed."""
+    threshold = time.time() - STALE_TMP_SECONDS
+    for entry in os.scandir(checkpoint_dir):
+        if not entry.name.endswith(".tmp"):
+            continue
+        try:
+            if entry.stat().st_mtime < threshold:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            # renamed or removed by another worker in the meantime
+            pass
+
+
+def load_manifest(checkpoint_dir: str) -> typing.Optional[ChunkManifest]:
+    """Load the manifest from `checkpoint_dir` or return `None` if there is none."""
+    try:
+        with open(os.path.join(checkpoint_dir, MANIFEST_FILENAME)) as handle:
+            data = json.load(handle)
+    except FileNotFoundError:
+        return None
+    return ChunkManifest(
+        data["filename"],
+        data["size"],
+        data["mtime_ns"],
+        data["chunk_size"],
+        tuple(data["fieldnames"]),
+        tuple(data["boundaries"]),
+    )
+
+
+def save_manifest(checkpoint_dir: str, manifest: ChunkManifest) -> None:
+    data = json.dumps(manifest._asdict(), indent=1).encode()
+    _write_atomically(os.path.join(checkpoint_dir, MANIFEST_FILENAME), data)
+
+
+def prepare_checkpoint(
+    directory: str,
+    checkpoint_dir: str,
+    filename: str = "stop_times.txt",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ChunkManifest:
+    """Return the manifest in `checkpoint_dir` or create a new one.
+
+    An existing manifest is only reused if it was made for the same file (name, size and
+    modification time) and chunk size. Otherwise, all existing chunks are discarded.
+    Temporary files older than `STALE_TMP_SECONDS` are removed, younger ones may still be
+    written by a parallel worker.
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    _remove_stale_tmp_files(checkpoint_dir)
+    manifest = load_manifest(checkpoint_dir)
+    stat = os.stat(os.path.join(directory, filename))
+    if (
+        manifest is not None
+        and manifest.filename == filename
+        and manifest.size == stat.st_size
+        and manifest.mtime_ns == stat.st_mtime_ns
+        and manifest.chunk_size == chunk_size
+    ):
+        _remove_outdated_chunks(checkpoint_dir, manifest)
+        return manifest
+    if manifest is not None:
+        logger.info("discarding outdated checkpoint in %r", checkpoint_dir)
+    manifest = plan_chunks(directory, filename, chunk_size)
+    save_manifest(checkpoint_dir, manifest)
+    _remove_outdated_chunks(checkpoint_dir, manifest)
+    return manifest
+
+
+def _remove_outdated_chunks(checkpoint_dir: str, manifest: ChunkManifest) -> None:
+    """Remove chunks made for other plans, e.g. written late by a worker with an old manifest."""
+    prefix = f"chunk-{manifest.fingerprint}-"
+    for entry in os.scandir(checkpoint_dir):
+        name = entry.name
+        if name.startswith("chunk-") and name.endswith(".pickle"):
+            if not name.startswith(prefix):
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+def is_chunk_completed(
+    checkpoint_dir: str, manifest: ChunkManifest, index: int
+) -> bool:
+    return os.path.exists(_chunk_path(checkpoint_dir, manifest, index))
+
+
+def ingest_stop_times_chunk(
+    directory: str, checkpoint_dir: str, manifest: ChunkManifest, index: int
+) -> StopTimeColumns:
+    """Parse chunk `index` of stop_times.txt and persist it in `checkpoint_dir`.
+
+    Chunks are written atomically, so each chunk is either completed or missing.
+    Different chunks can be ingested independently, e.g. by parallel workers.
+    """
+    columns = parse_stop_times_chunk(directory, manifest, index)
+    data = pickle.dumps(
+        (manifest.fingerprint, columns), protocol=pickle.HIGHEST_PROTOCOL
+    )
+    _write_atomically(_chunk_path(checkpoint_dir, manifest, index), data)
+    return columns
+
+
+def load_stop_times_chunk(
+    checkpoint_dir: str, manifest: ChunkManifest, index: int
+) -> StopTimeColumns:
+    """Load a completed chunk from `checkpoint_dir`.
+
+    Raises `ValueError` if the chunk was not made for `manifest`.
+    """
+    with open(_chunk_path(checkpoint_dir, manifest, index), "rb") as handle:
+        fingerprint, columns = pickle.load(handle)
+    if fingerprint != manifest.fingerprint:
+        raise ValueError(f"chunk {index} was made for a different manifest")
+    return columns
+
+
+def read_stop_times_chunked(
+    directory: str,
+    checkpoint_dir: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    trip_ids: typing.Optional[typing.AbstractSet[str]] = None,
+    chunk_indices: typing.Optional[typing.Iterable[int]] = None,
+    id_pool: typing.Optional[IdPool] = None,
+) -> typing.Dict[str, typing.List[StopTime]]:
+    """Read stop_times.txt in chunks as a dict mapping trip id to list of StopTimes.
+
+    Each parsed chunk is persisted in `checkpoint_dir` together with a manifest.
+    If the job is restarted with the same `checkpoint_dir`, completed chunks are loaded
+    instead of being parsed again.
+
+    `chunk_indices` is an optional iterable for loading only specific chunks. Trips spanning
+    several chunks are only complete if all of their chunks are loaded.
+    `trip_ids` and `id_pool` have the same meaning as for `pygtfslib.temporal.read_stop_times`.
+    """
+    manifest = prepare_checkpoint(
+        directory, checkpoint_dir, "stop_times.txt", chunk_size
+    )
+    if chunk_indices is None:
+        chunk_indices = range(manifest.n_chunks)
+    str_cache = lru_cache(maxsize=None)(lambda s: s)
+    id_cache = id_pool.intern if id_pool is not None else None
+    stop_times: typing.List[StopTime] = []
+    for index in chunk_indices:
+        if is_chunk_completed(checkpoint_dir, manifest, index):
+            logger.info("loading chunk %d/%d ...", index + 1, manifest.n_chunks)
+            columns = load_stop_times_chunk(checkpoint_dir, manifest, index)
+        else:
+            logger.info("parsing chunk %d/%d ...", index + 1, manifest.n_chunks)
+            columns = ingest_stop_times_chunk(
+                directory, checkpoint_dir, manifest, index
+            )
+        stop_times.extend(columns.iter_stop_times(str_cache, id_cache, trip_ids))
+        del columns
+    del str_cache
+    logger.info("sorting stop times ...")
+    stop_times.sort(key=attrgetter("trip_id", "stop_sequence"))
+    return {
+        trip_id: list(group)
+        for trip_id, group in itertools.groupby(stop_times, key=attrgetter("trip_id"))
+    }
@@ -1,3 +1,4 @@
+import io
 import os
 import csv
 import logging
@@ -26,6 +27,15 @@ def iter_rows(directory, filename):
         yield from (dict(zip(fieldnames, row)) for row in reader)
 
 
+def _make_row_class(fieldnames, optional_fieldnames):
+    """Create the namedtuple class for rows with `fieldnames` plus missing optional ones."""
+    fieldnames = list(fieldnames)
+    missing_optional_fieldnames = set(optional_fieldnames) - set(fieldnames)
+    fieldnames.extend(missing_optional_fieldnames)
+    # rename for possible extra columns which may not be a python name
+    return namedtuple("Row", fieldnames, defaults=[None] * len(fieldnames), rename=True)
+
+
 def iter_rows_as_namedtuples(directory, filename, optional_fieldnames=()):
     """Iterate over a CSV file yielding rows as namedtuples.
 
@@ -36,12 +46,28 @@ def iter_rows_as_namedtuples(directory, filename, optional_fieldnames=()):
     logger.info("reading from %r ...", path)
     with open(path, newline="", encoding="utf-8-sig") as handle:
         reader = csv.reader(handle, strict=True)
-        fieldnames = next(reader)
-        missing_optional_fieldnames = set(optional_fieldnames) - set(fieldnames)
-        fieldnames.extend(missing_optional_fieldnames)
-        # rename for possible extra columns which may not be a python name
-        cls = namedtuple(
-            "Row", fieldnames, defaults=[None] * len(fieldnames), rename=True
-        )
+        cls = _make_row_class(next(reader), optional_fieldnames)
         # we cannot return directly since this would close the handle
         yield from starmap(cls, reader)
+
+
+def iter_byte_range_as_namedtuples(
+    directory, filename, fieldnames, start, end, optional_fieldnames=()
+):
+    """Iterate over the rows in a byte range of a CSV file yielding rows as namedtuples.
+
+    The byte range has to start and end at line boundaries and must not include the header,
+    so `fieldnames` have to be passed explicitly.
+    The byte range is read completely on the first iteration.
+    """
+    path = os.path.join(directory, filename)
+    logger.info("reading bytes %d to %d from %r ...", start, end, path)
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        data = handle.read(end - start)
+    cls = _make_row_class(fieldnames, optional_fieldnames)
+    # a BOM can only be at the very start of the file, i.e. before the header which is never part
+    # of the byte range, so plain utf-8 is used instead of utf-8-sig
+    text = data.decode("utf-8")
+    reader = csv.reader(io.StringIO(text, newline=""), strict=True)
+    yield from starmap(cls, reader)
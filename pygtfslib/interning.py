@@ -0,0 +1,81 @@
+import typing
+
+
+_TOptionalStr = typing.TypeVar("_TOptionalStr", bound=typing.Optional[str])
+
+
+class IdPool:
+    """A feed-scoped pool for interning id strings.
+
+    Every string added to the pool is mapped to a dense integer (0, 1, 2, ...) in order of
+    insertion. The integer can be converted back to the string with `get_str`.
+    Pass one instance to all readers of a feed so that all loaded structures share a single
+    copy of each id and integer ids can be used for joins.
+
+    The pool itself is callable and can be used as a `str_cache` for `StopTime`.
+    """
+
+    __slots__ = ("_indices", "_strings")
+
+    _indices: typing.Dict[str, int]
+    _strings: typing.List[str]
+
+    def __init__(self, values: typing.Iterable[str] = ()) -> None:
+        self._indices = {}
+        self._strings = []
+        for value in values:
+            self.get_int(value)
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def __contains__(self, value: object) -> bool:
+        return value in self._indices
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self._strings)
+
+    def __call__(self, value: _TOptionalStr) -> _TOptionalStr:
+        return self.intern(value)
+
+    def intern(self, value: _TOptionalStr) -> _TOptionalStr:
+        """Return the pooled copy of `value`, adding it to the pool if necessary.
+
+        `None` is passed through unchanged.
+        """
+        if value is None:
+            return value
+        return typing.cast(_TOptionalStr, self._strings[self.get_int(value)])
+
+    def get_int(self, value: str) -> int:
+        """Return the dense integer for `value`, adding it to the pool if necessary."""
+        try:
+            return self._indices[value]
+        except KeyError:
+            index = self._indices[value] = len(self._strings)
+            self._strings.append(value)
+            return index
+
+    def find_int(self, value: str) -> typing.Optional[int]:
+        """Return the dense integer for `value` or `None` if it is not in the pool."""
+        return self._indices.get(value)
+
+    def get_str(self, index: int) -> str:
+        """Return the string for a dense integer returned by `get_int`.
+
+        Raises `IndexError` for unknown integers.
+        """
+        if index < 0:
+            raise IndexError(f"invalid id index: {index}")
+        return self._strings[index]
+
+
+def _identity(value: _TOptionalStr) -> _TOptionalStr:
+    return value
+
+
+def get_interner(
+    id_pool: typing.Optional[IdPool],
+) -> typing.Callable[[_TOptionalStr], _TOptionalStr]:
+    """Return `id_pool.intern` or a function returning its argument if `id_pool` is `None`."""
+    return id_pool.intern if id_pool is not None else _identity
@@ -1,4 +1,4 @@
-from functools import lru_cache
+import operator
 import typing
 
 
@@ -26,28 +26,68 @@ SIMPLE_ROUTE_TYPE_TO_MOT: typing.Dict[int, str] = {
 }
 
 
-@lru_cache(maxsize=512)
-def route_type_to_mot(
-    route_type: int, fallback: typing.Optional[str] = None
-) -> typing.Optional[str]:
-    """Return geOps routing API mot from GTFS (extended) route type
+# highest extended route type is 1702 (horse-drawn carriage)
+MAX_ROUTE_TYPE = 1799
 
-    https://developers.google.com/transit/gtfs/reference/extended-route-types
-    """
+
+def _route_type_to_simple_route_type(route_type: int) -> int:
     if 100 <= route_type <= 117 or route_type == 1503:
-        route_type = 2
+        return 2
     elif 200 <= route_type <= 209:
-        route_type = 200
+        return 200
     elif 400 <= route_type <= 405:
-        route_type = 1
+        return 1
     elif 700 <= route_type <= 716 or route_type in {1500, 1501, 1505, 1506, 1507}:
-        route_type = 3
+        return 3
     elif 900 <= route_type <= 906:
-        route_type = 0
+        return 0
     elif route_type in {1000, 1200, 1502}:
-        route_type = 4
+        return 4
     elif route_type == 1300:
-        route_type = 6
+        return 6
     elif route_type == 1400:
-        route_type = 7
-    return SIMPLE_ROUTE_TYPE_TO_MOT.get(route_type) or fallback
+        return 7
+    return route_type
+
+
+# lookup table indexed by route type, `None` if there is no corresponding mot
+ROUTE_TYPE_TO_MOT_TABLE: typing.Tuple[typing.Optional[str], ...] = tuple(
+    SIMPLE_ROUTE_TYPE_TO_MOT.get(_route_type_to_simple_route_type(route_type))
+    for route_type in range(MAX_ROUTE_TYPE + 1)
+)
+
+
+def _lookup_mot(route_type: typing.Union[int, float]) -> typing.Optional[str]:
+    if isinstance(route_type, float):
+        # integral floats are common in columns with missing values
+        if not route_type.is_integer():
+            return None
+        index = int(route_type)
+    else:
+        index = operator.index(route_type)
+    if 0 <= index <= MAX_ROUTE_TYPE:
+        return ROUTE_TYPE_TO_MOT_TABLE[index]
+    return None
+
+
+def route_type_to_mot(
+    route_type: typing.Union[int, float], fallback: typing.Optional[str] = None
+) -> typing.Optional[str]:
+    """Return geOps routing API mot from GTFS (extended) route type
+
+    Integral floats are treated like ints, other values (e.g. NaN) map to `fallback`.
+
+    https://developers.google.com/transit/gtfs/reference/extended-route-types
+    """
+    return _lookup_mot(route_type) or fallback
+
+
+def route_types_to_mots(
+    route_types: typing.Iterable[typing.Union[int, float]],
+    fallback: typing.Optional[str] = None,
+) -> typing.List[typing.Optional[str]]:
+    """Return geOps routing API mots for a column of GTFS (extended) route types.
+
+    This is the bulk version of `route_type_to_mot` using a single table lookup per route type.
+    """
+    return [_lookup_mot(route_type) or fallback for route_type in route_types]
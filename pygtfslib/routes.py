@@ -0,0 +1,135 @@
+import typing
+
+from dateutil.tz import gettz
+
+from .fast_csv import iter_rows_as_namedtuples
+from .interning import IdPool, get_interner
+from .mot import route_types_to_mots
+from .temporal import TimeCache
+
+
+class Agency(typing.NamedTuple):
+    agency_id: str
+    agency_name: str
+    agency_url: str
+    agency_timezone: str
+    agency_lang: typing.Optional[str]
+
+
+class Route(typing.NamedTuple):
+    route_id: str
+    agency_id: typing.Optional[str]
+    route_short_name: typing.Optional[str]
+    route_long_name: typing.Optional[str]
+    route_type: int
+
+
+def read_agencies(
+    directory: str, id_pool: typing.Optional[IdPool] = None
+) -> typing.Dict[str, Agency]:
+    """Read agency.txt as a dict mapping agency id to `Agency`.
+
+    agency_id is optional in GTFS if there is only one agency; it is an empty string in this case.
+    If an `id_pool` is given, agency ids are interned in it.
+    """
+    intern = get_interner(id_pool)
+    agencies = {}
+    for row in iter_rows_as_namedtuples(
+        directory, "agency.txt", optional_fieldnames=["agency_id", "agency_lang"]
+    ):
+        agency_id = intern(row.agency_id or "")
+        if agency_id in agencies:
+            raise ValueError(f"duplicate agency_id: {agency_id!r}")
+        agencies[agency_id] = Agency(
+            agency_id,
+            row.agency_name,
+            row.agency_url,
+            row.agency_timezone,
+            row.agency_lang or None,
+        )
+    return agencies
+
+
+def read_routes(
+    directory: str, id_pool: typing.Optional[IdPool] = None
+) -> typing.Dict[str, Route]:
+    """Read routes.txt as a dict mapping route id to `Route`.
+
+    If an `id_pool` is given, route ids and agency ids are interned in it.
+    """
+    intern = get_interner(id_pool)
+    routes = {}
+    for row in iter_rows_as_namedtuples(
+        directory,
+        "routes.txt",
+        optional_fieldnames=["agency_id", "route_short_name", "route_long_name"],
+    ):
+        route_id = intern(row.route_id)
+        if route_id in routes:
+            raise ValueError(f"duplicate route_id: {route_id!r}")
+        routes[route_id] = Route(
+            route_id,
+            intern(row.agency_id) if row.agency_id else None,
+            row.route_short_name or None,
+            row.route_long_name or None,
+            int(row.route_type),
+        )
+    return routes
+
+
+def get_route_id_to_mot(
+    routes: typing.Mapping[str, Route], fallback: typing.Optional[str] = None
+) -> typing.Dict[str, typing.Optional[str]]:
+    """Return a dict mapping route id to geOps routing API mot.
+
+    See `pygtfslib.mot.route_type_to_mot` for the meaning of `fallback`.
+    """
+    mots = route_types_to_mots(
+        [route.route_type for route in routes.values()], fallback
+    )
+    return dict(zip(routes.keys(), mots))
+
+
+def get_route_id_to_timezone(
+    routes: typing.Mapping[str, Route], agencies: typing.Mapping[str, Agency]
+) -> typing.Dict[str, str]:
+    """Return a dict mapping route id to the timezone name of its agency.
+
+    Routes without agency_id are assigned to the agency if there is exactly one.
+    """
+    default_agency = next(iter(agencies.values())) if len(agencies) == 1 else None
+    route_id_to_timezone = {}
+    for route_id, route in routes.items():
+        if route.agency_id is None:
+            if default_agency is None:
+                raise ValueError(f"missing agency_id for route {route_id!r}")
+            agency = default_agency
+        else:
+            try:
+                agency = agencies[route.agency_id]
+            except KeyError:
+                raise ValueError(
+                    f"unknown agency_id {route.agency_id!r} for route {route_id!r}"
+                ) from None
+        route_id_to_timezone[route_id] = agency.agency_timezone
+    return route_id_to_timezone
+
+
+def get_route_id_to_time_cache(
+    routes: typing.Mapping[str, Route], agencies: typing.Mapping[str, Agency]
+) -> typing.Dict[str, TimeCache]:
+    """Return a dict mapping route id to a `TimeCache` for the timezone of its agency.
+
+    Routes with the same timezone share the same `TimeCache` instance.
+    """
+    time_caches: typing.Dict[str, TimeCache] = {}
+    route_id_to_time_cache = {}
+    for route_id, timezone_name in get_route_id_to_timezone(routes, agencies).items():
+        time_cache = time_caches.get(timezone_name)
+        if time_cache is None:
+            timezone = gettz(timezone_name)
+            if timezone is None:
+                raise ValueError(f"unknown timezone: {timezone_name!r}")
+            time_cache = time_caches[timezone_name] = TimeCache(timezone)
+        route_id_to_time_cache[route_id] = time_cache
+    return route_id_to_time_cache
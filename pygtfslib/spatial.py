@@ -3,6 +3,7 @@ import itertools
 from operator import attrgetter
 
 from .fast_csv import iter_rows_as_namedtuples
+from .interning import IdPool, get_interner
 
 
 class ShapeRow(typing.NamedTuple):
@@ -19,6 +20,7 @@ def read_shapes(
     factory: typing.Callable[[typing.Iterable[ShapeRow]], _T],
     shape_ids: typing.Optional[typing.AbstractSet[str]] = None,
     assume_sorted: bool = False,
+    id_pool: typing.Optional[IdPool] = None,
 ) -> typing.Dict[str, _T]:
     """Read shapes.txt as a dict mapping shape id to shape.
 
@@ -29,6 +31,8 @@ def read_shapes(
 
     If `assume_sorted` is set to `True`, it is assumed that the rows in shapes.txt are sorted by
     shape_id and shape_pt_sequence. No check is performed whether data is really sorted.
+
+    If an `id_pool` is given, shape ids are interned in it.
     """
     iter_file_rows = iter_rows_as_namedtuples(
         directory, "shapes.txt", optional_fieldnames=["shape_dist_traveled"]
@@ -42,8 +46,9 @@ def read_shapes(
     else:
         file_rows = list(iter_file_rows)
         file_rows.sort(key=lambda row: (row.shape_id, int(row.shape_pt_sequence)))
+    intern = get_interner(id_pool)
     return {
-        shape_id: factory(
+        intern(shape_id): factory(
             ShapeRow(
                 float(row.shape_pt_lon),
                 float(row.shape_pt_lat),
@@ -11,6 +11,7 @@ from dateutil.tz import tzutc
 from dateutil import rrule
 
 from .fast_csv import iter_rows, iter_rows_as_namedtuples
+from .interning import IdPool, get_interner
 
 
 logger = logging.getLogger(__name__)
@@ -145,19 +146,28 @@ def parse_calendar_row(
 
 
 def read_calendar(
-    directory, first_opday=datetime.date.min, last_opday=datetime.date.max
+    directory,
+    first_opday=datetime.date.min,
+    last_opday=datetime.date.max,
+    id_pool: typing.Optional[IdPool] = None,
 ):
     """Read GTFS calendar.txt and calendar_dates.txt from directory.
 
     Return a defaultdict mapping service_id to a set of operating days.
     The operating day range can be clipped by specifying first_/last_opday.
+    If an `id_pool` is given, service ids are interned in it.
 
     If neither of the two files is present, an empty defaultdict(set) is returned.
     """
+    intern = get_interner(id_pool)
+    service_id_to_dates: typing.DefaultDict[str, typing.Set[datetime.date]]
     service_id_to_dates = defaultdict(set)
     try:
         service_id_to_dates.update(
-            (row["service_id"], parse_calendar_row(row, first_opday, last_opday))
+            (
+                intern(row["service_id"]),
+                parse_calendar_row(row, first_opday, last_opday),
+            )
             for row in iter_rows(directory, "calendar.txt")
         )
     except FileNotFoundError:
@@ -169,9 +179,9 @@ def read_calendar(
                 continue
             exc_type = row["exception_type"]
             if exc_type == "1":
-                service_id_to_dates[row["service_id"]].add(date)
+                service_id_to_dates[intern(row["service_id"])].add(date)
             elif exc_type == "2":
-                service_id_to_dates[row["service_id"]].discard(date)
+                service_id_to_dates[intern(row["service_id"])].discard(date)
             else:
                 raise ValueError(f"invalid exception type: {exc_type!r}")
     except FileNotFoundError:
@@ -179,12 +189,17 @@ def read_calendar(
     return service_id_to_dates
 
 
-def read_frequency_timedeltas(directory, frequency_based_log_level=logging.WARNING):
+def read_frequency_timedeltas(
+    directory,
+    frequency_based_log_level=logging.WARNING,
+    id_pool: typing.Optional[IdPool] = None,
+):
     """Read frequencies.txt from directory.
 
     Return a defaultdict mapping trip_id to a sorted list of timedeltas of the trip starting times.
     The timedeltas are in the usual GTFS sence and can be converted to a datetime using
     `TimeCache.gtfs_time_to_datetime` for a specific operating day.
+    If an `id_pool` is given, trip ids are interned in it.
 
     If frequencies.txt is not present, an empty defaultdict(list) is returned.
 
@@ -192,12 +207,16 @@ def read_frequency_timedeltas(directory, frequency_based_log_level=logging.WARNI
              In reality, starting times of frequency based trips are
              only known in combination with GTFS-RT data.
     """
+    intern = get_interner(id_pool)
+    trip_id_to_start_timedeltas: typing.DefaultDict[
+        str, typing.List[datetime.timedelta]
+    ]
     trip_id_to_start_timedeltas = defaultdict(list)
     try:
         n_frequency_based = 0
         half_a_second = datetime.timedelta(seconds=0.5)
         for row in iter_rows(directory, "frequencies.txt"):
-            trip_id = row["trip_id"]
+            trip_id = intern(row["trip_id"])
             start = parse_timedelta(row["start_time"])
             end = parse_timedelta(row["end_time"])
             headway_secs = int(row["headway_secs"])
@@ -234,48 +253,80 @@ def read_frequency_timedeltas(directory, frequency_based_log_level=logging.WARNI
 
 
 class TripOpDayProvider:
-    """Provide information about operating days specific trips run on."""
+    """Provide information about operating days specific trips run on.
+
+    Trips of the same service share a single frozenset of operating days, a trip running on
+    several services gets the union of their sets.
+    If an `id_pool` is given, trip ids and service ids are interned in it and trips can also be
+    looked up by the dense integers of their ids.
+    """
 
-    trip_id_to_opdays: typing.Dict[str, typing.Set[datetime.date]]
+    trip_id_to_opdays: typing.Dict[str, typing.FrozenSet[datetime.date]]
+    id_pool: typing.Optional[IdPool]
 
     def __init__(
-        self, trip_id_to_opdays: typing.Mapping[str, typing.AbstractSet[datetime.date]]
+        self,
+        trip_id_to_opdays: typing.Mapping[str, typing.AbstractSet[datetime.date]],
+        id_pool: typing.Optional[IdPool] = None,
     ) -> None:
-        self.trip_id_to_opdays = {k: set(v) for k, v in trip_id_to_opdays.items()}
+        self.id_pool = id_pool
+        intern = get_interner(id_pool)
+        self.trip_id_to_opdays = {
+            intern(k): frozenset(v) for k, v in trip_id_to_opdays.items()
+        }
 
     def load_directories(self, *directories: str) -> None:
+        id_pool = self.id_pool
+        intern = get_interner(id_pool)
+        no_opdays: typing.FrozenSet[datetime.date] = frozenset()
         for directory in directories:
-            calendar = read_calendar(directory)
+            service_id_to_opdays = {
+                service_id: frozenset(opdays)
+                for service_id, opdays in read_calendar(
+                    directory, id_pool=id_pool
+                ).items()
+            }
             for row in iter_rows(directory, "trips.txt"):
-                trip_id = row["trip_id"]
-                opdays = calendar.get(row["service_id"], set())
-                if trip_id in self.trip_id_to_opdays:
-                    self.trip_id_to_opdays[trip_id] |= opdays
-                else:
-                    self.trip_id_to_opdays[trip_id] = set(opdays)
+                trip_id = intern(row["trip_id"])
+                opdays = service_id_to_opdays.get(row["service_id"], no_opdays)
+                trip_opdays = self.trip_id_to_opdays.get(trip_id)
+                if trip_opdays is None:
+                    self.trip_id_to_opdays[trip_id] = opdays
+                elif not opdays <= trip_opdays:
+                    # copy on union, the set of the service is shared with other trips
+                    self.trip_id_to_opdays[trip_id] = trip_opdays | opdays
+
+    def _get_trip_opdays(
+        self, trip_id: typing.Union[str, int]
+    ) -> typing.FrozenSet[datetime.date]:
+        if isinstance(trip_id, int):
+            if self.id_pool is None:
+                raise TypeError("looking up trips by integer requires an id_pool")
+            trip_id = self.id_pool.get_str(trip_id)
+        return self.trip_id_to_opdays[trip_id]
 
     def get_qualified_opdays(
         self,
-        trip_ids: typing.Union[str, typing.AbstractSet[str]],
+        trip_ids: typing.Union[str, int, typing.AbstractSet[typing.Union[str, int]]],
         criterion: typing.Callable[[datetime.date], bool],
     ) -> typing.Set[datetime.date]:
-        if isinstance(trip_ids, str):
+        if isinstance(trip_ids, (str, int)):
             trip_ids = {trip_ids}
         qualified_opdays: typing.Set[datetime.date] = set()
         for trip_id in trip_ids:
-            trip_opdays = self.trip_id_to_opdays[trip_id]
+            trip_opdays = self._get_trip_opdays(trip_id)
             qualified_opdays.update(filter(criterion, trip_opdays))
         return qualified_opdays
 
     def has_qualified_opdays(
         self,
-        trip_ids: typing.Union[str, typing.AbstractSet[str]],
+        trip_ids: typing.Union[str, int, typing.AbstractSet[typing.Union[str, int]]],
         criterion: typing.Callable[[datetime.date], bool],
     ) -> bool:
-        if isinstance(trip_ids, str):
+        if isinstance(trip_ids, (str, int)):
             trip_ids = {trip_ids}
         for trip_id in trip_ids:
-            trip_opdays = self.trip_id_to_opdays[trip_id]
+            trip_opdays = self._get_trip_opdays(trip_id)
             if any(map(criterion, trip_opdays)):
                 return True
         return False
@@ -313,16 +364,21 @@ class StopTime:
         self,
         row: typing.Any,
         str_cache: typing.Callable[[_TOptionalStr], _TOptionalStr] = lambda s: s,
+        id_cache: typing.Optional[typing.Callable[[str], str]] = None,
     ) -> None:
+        # ids may be interned separately from free text like headsigns
+        cache_id = typing.cast(
+            typing.Callable[[str], str], str_cache if id_cache is None else id_cache
+        )
         if row.trip_id is None:
             raise ValueError(f"missing trip_id for row {row!r}")
-        self.trip_id = typing.cast(str, str_cache(row.trip_id))
+        self.trip_id = cache_id(row.trip_id)
         self.stop_sequence = int(row.stop_sequence)
         self.arrival_time = parse_timedelta(row.arrival_time)
         self.departure_time = parse_timedelta(row.departure_time)
         if row.stop_id is None:
             raise ValueError(f"missing stop_id for row {row!r}")
-        self.stop_id = typing.cast(str, str_cache(row.stop_id))
+        self.stop_id = cache_id(row.stop_id)
         self.stop_headsign = str_cache(row.stop_headsign)
         self.pickup_type = int(row.pickup_type or 0)
         self.drop_off_type = int(row.drop_off_type or 0)
@@ -331,6 +387,35 @@ class StopTime:
         )
         self.timepoint = int(row.timepoint or 1)
 
+    @classmethod
+    def from_values(
+        cls,
+        *,
+        trip_id: str,
+        stop_sequence: int,
+        arrival_time: typing.Optional[datetime.timedelta],
+        departure_time: typing.Optional[datetime.timedelta],
+        stop_id: str,
+        stop_headsign: typing.Optional[str],
+        pickup_type: int,
+        drop_off_type: int,
+        shape_dist_traveled: typing.Optional[float],
+        timepoint: int,
+    ) -> "StopTime":
+        """Create a StopTime from already parsed values instead of a row of stop_times.txt."""
+        stop_time = cls.__new__(cls)
+        stop_time.trip_id = trip_id
+        stop_time.stop_sequence = stop_sequence
+        stop_time.arrival_time = arrival_time
+        stop_time.departure_time = departure_time
+        stop_time.stop_id = stop_id
+        stop_time.stop_headsign = stop_headsign
+        stop_time.pickup_type = pickup_type
+        stop_time.drop_off_type = drop_off_type
+        stop_time.shape_dist_traveled = shape_dist_traveled
+        stop_time.timepoint = timepoint
+        return stop_time
+
     @property
     def arrival_or_departure_time(self) -> typing.Optional[datetime.timedelta]:
         return self.departure_time if self.arrival_time is None else self.arrival_time
@@ -340,34 +425,43 @@ class StopTime:
         return self.arrival_time if self.departure_time is None else self.departure_time
 
 
+STOP_TIMES_OPTIONAL_FIELDNAMES = (
+    "arrival_time",
+    "departure_time",
+    "shape_dist_traveled",
+    "pickup_type",
+    "drop_off_type",
+    "timepoint",
+    "stop_headsign",
+)
+
+
 def read_stop_times(
     directory: str,
     trip_ids: typing.Optional[typing.AbstractSet[str]] = None,
+    id_pool: typing.Optional[IdPool] = None,
 ) -> typing.Dict[str, typing.List[StopTime]]:
     """Read stop_times.txt as a dict mapping trip id to list of StopTimes.
 
     `trip_ids` is an optional set for selecting only specific trip ids.
+    If an `id_pool` is given, trip ids and stop ids are interned in it.
+    Other strings (and ids without `id_pool`) are only interned for the duration of this call.
     """
     iter_rows = iter_rows_as_namedtuples(
         directory,
         "stop_times.txt",
-        optional_fieldnames=[
-            "arrival_time",
-            "departure_time",
-            "shape_dist_traveled",
-            "pickup_type",
-            "drop_off_type",
-            "timepoint",
-            "stop_headsign",
-        ],
+        optional_fieldnames=STOP_TIMES_OPTIONAL_FIELDNAMES,
     )
     str_cache = lru_cache(maxsize=None)(lambda s: s)
+    id_cache = id_pool.intern if id_pool is not None else None
     if trip_ids is not None:
         stop_times = [
-            StopTime(row, str_cache) for row in iter_rows if row.trip_id in trip_ids
+            StopTime(row, str_cache, id_cache)
+            for row in iter_rows
+            if row.trip_id in trip_ids
         ]
     else:
-        stop_times = [StopTime(row, str_cache) for row in iter_rows]
+        stop_times = [StopTime(row, str_cache, id_cache) for row in iter_rows]
     del str_cache
     logger.info("sorting stop times ...")
     stop_times.sort(key=attrgetter("trip_id", "stop_sequence"))
@@ -0,0 +1,166 @@
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from pygtfslib import chunked
+from pygtfslib.chunked import (
+    ingest_stop_times_chunk,
+    is_chunk_completed,
+    load_stop_times_chunk,
+    load_manifest,
+    plan_chunks,
+    prepare_checkpoint,
+    read_stop_times_chunked,
+)
+from pygtfslib.interning import IdPool
+from pygtfslib.temporal import read_stop_times
+
+
+def write_stop_times(directory, n_trips=20, n_stops=5):
+    lines = ["trip_id,stop_sequence,arrival_time,departure_time,stop_id,stop_headsign"]
+    for trip in reversed(range(n_trips)):
+        for seq in range(n_stops):
+            time = f"{10 + seq:02d}:{trip:02d}:00" if seq != 2 else ""
+            headsign = '"Main St, North"' if seq == 0 else ""
+            lines.append(f"T{trip},{seq},{time},{time},S{seq},{headsign}")
+    (directory / "stop_times.txt").write_text("\r\n".join(lines) + "\r\n")
+
+
+def as_tuples(stop_times):
+    return {
+        trip_id: [tuple(getattr(st, name) for name in st.__slots__) for st in sts]
+        for trip_id, sts in stop_times.items()
+    }
+
+
+def test_plan_chunks(tmp_path):
+    write_stop_times(tmp_path)
+    manifest = plan_chunks(str(tmp_path), "stop_times.txt", chunk_size=100)
+    assert manifest.n_chunks > 1
+    assert manifest.boundaries[-1] == manifest.size
+    data = (tmp_path / "stop_times.txt").read_bytes()
+    for boundary in manifest.boundaries[:-1]:
+        assert data[boundary - 1 : boundary] == b"\n"
+    with pytest.raises(ValueError):
+        plan_chunks(str(tmp_path), "stop_times.txt", chunk_size=0)
+
+
+def test_read_stop_times_chunked(tmp_path):
+    write_stop_times(tmp_path)
+    checkpoint_dir = str(tmp_path / "checkpoint")
+    expected = as_tuples(read_stop_times(str(tmp_path)))
+
+    result = read_stop_times_chunked(str(tmp_path), checkpoint_dir, chunk_size=100)
+    assert as_tuples(result) == expected
+    assert load_manifest(checkpoint_dir).chunk_size == 100
+
+    result = read_stop_times_chunked(
+        str(tmp_path), checkpoint_dir, chunk_size=100, trip_ids={"T3"}
+    )
+    assert as_tuples(result) == {"T3": expected["T3"]}
+
+
+def test_read_stop_times_chunked_id_pool(tmp_path):
+    (tmp_path / "stop_times.txt").write_text(
+        "trip_id,stop_sequence,stop_id,stop_headsign\n"
+        "T1,1,S1,Nord\n"
+        "T2,1,S2,Süd\n",
+        encoding="utf-8",
+    )
+    expected_pool = IdPool()
+    expected = read_stop_times(str(tmp_path), trip_ids={"T1"}, id_pool=expected_pool)
+
+    pool = IdPool()
+    result = read_stop_times_chunked(
+        str(tmp_path), str(tmp_path / "checkpoint"), trip_ids={"T1"}, id_pool=pool
+    )
+    assert as_tuples(result) == as_tuples(expected)
+    # unselected trips and headsigns do not end up in the pool
+    assert list(pool) == list(expected_pool) == ["T1", "S1"]
+
+
+def test_read_stop_times_chunked_wide_values(tmp_path):
+    (tmp_path / "stop_times.txt").write_text(
+        "trip_id,stop_sequence,stop_id,pickup_type,drop_off_type,timepoint\n"
+        "T,1,S,200,300,400\n"
+    )
+    result = read_stop_times_chunked(str(tmp_path), str(tmp_path / "checkpoint"))
+    assert as_tuples(result) == as_tuples(read_stop_times(str(tmp_path)))
+
+
+def test_read_stop_times_chunked_resumes(tmp_path):
+    write_stop_times(tmp_path)
+    checkpoint_dir = str(tmp_path / "checkpoint")
+    parse = chunked.parse_stop_times_chunk
+    parsed = []
+
+    def parse_until_preempted(directory, manifest, index):
+        if len(parsed) == 2:
+            raise KeyboardInterrupt
+        parsed.append(index)
+        return parse(directory, manifest, index)
+
+    with patch("pygtfslib.chunked.parse_stop_times_chunk", parse_until_preempted):
+        with pytest.raises(KeyboardInterrupt):
+            read_stop_times_chunked(str(tmp_path), checkpoint_dir, chunk_size=100)
+    assert parsed == [0, 1]
+
+    parsed.clear()
+    with patch("pygtfslib.chunked.parse_stop_times_chunk", side_effect=parse) as mock:
+        result = read_stop_times_chunked(str(tmp_path), checkpoint_dir, chunk_size=100)
+    n_chunks = load_manifest(checkpoint_dir).n_chunks
+    assert [call.args[2] for call in mock.call_args_list] == list(range(2, n_chunks))
+    assert as_tuples(result) == as_tuples(read_stop_times(str(tmp_path)))
+
+    # a different chunk size invalidates the checkpoint
+    with patch("pygtfslib.chunked.parse_stop_times_chunk", side_effect=parse) as mock:
+        read_stop_times_chunked(
+            str(tmp_path), checkpoint_dir, chunk_size=200, chunk_indices=[0]
+        )
+    assert mock.call_count == 1
+    assert load_manifest(checkpoint_dir).chunk_size == 200
+
+
+def test_prepare_checkpoint_removes_stale_tmp_files(tmp_path):
+    write_stop_times(tmp_path)
+    checkpoint_dir = tmp_path / "checkpoint"
+    checkpoint_dir.mkdir()
+    stale = checkpoint_dir / "chunk-000000.pickle.abc.tmp"
+    fresh = checkpoint_dir / "chunk-000001.pickle.def.tmp"
+    stale.write_bytes(b"partial")
+    fresh.write_bytes(b"partial")
+    old = time.time() - chunked.STALE_TMP_SECONDS - 1
+    os.utime(stale, (old, old))
+
+    prepare_checkpoint(str(tmp_path), str(checkpoint_dir), chunk_size=100)
+    assert not stale.exists()
+    assert fresh.exists()
+
+
+def test_chunks_are_tied_to_their_manifest(tmp_path):
+    write_stop_times(tmp_path)
+    checkpoint_dir = str(tmp_path / "checkpoint")
+    old_manifest = prepare_checkpoint(str(tmp_path), checkpoint_dir, chunk_size=100)
+    new_manifest = prepare_checkpoint(str(tmp_path), checkpoint_dir, chunk_size=200)
+    assert old_manifest.fingerprint != new_manifest.fingerprint
+
+    # a worker still holding the old manifest finishes its chunk after re-planning
+    ingest_stop_times_chunk(str(tmp_path), checkpoint_dir, old_manifest, 3)
+    assert not is_chunk_completed(checkpoint_dir, new_manifest, 3)
+    with pytest.raises(FileNotFoundError):
+        load_stop_times_chunk(checkpoint_dir, new_manifest, 3)
+
+    result = read_stop_times_chunked(str(tmp_path), checkpoint_dir, chunk_size=200)
+    assert as_tuples(result) == as_tuples(read_stop_times(str(tmp_path)))
+    assert not is_chunk_completed(checkpoint_dir, old_manifest, 3)
+
+    # the payload is checked as well
+    ingest_stop_times_chunk(str(tmp_path), checkpoint_dir, old_manifest, 0)
+    os.replace(
+        chunked._chunk_path(checkpoint_dir, old_manifest, 0),
+        chunked._chunk_path(checkpoint_dir, new_manifest, 0),
+    )
+    with pytest.raises(ValueError):
+        load_stop_times_chunk(checkpoint_dir, new_manifest, 0)
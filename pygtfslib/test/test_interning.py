@@ -0,0 +1,64 @@
+import pytest
+
+from pygtfslib.interning import IdPool
+from pygtfslib.temporal import read_calendar, read_stop_times, TripOpDayProvider
+
+
+def test_id_pool():
+    pool = IdPool(["a", "b"])
+    assert len(pool) == 2
+    assert pool.get_int("a") == 0
+    assert pool.get_int("c") == 2
+    assert pool.find_int("d") is None
+    assert "d" not in pool
+    assert list(pool) == ["a", "b", "c"]
+    assert pool.get_str(1) == "b"
+    with pytest.raises(IndexError):
+        pool.get_str(-1)
+    with pytest.raises(IndexError):
+        pool.get_str(3)
+
+    # build a string at runtime so it is not the same object as the literal
+    value = "".join(["c"])
+    assert pool.intern(value) is pool.get_str(2)
+    assert pool(None) is None
+    assert len(pool) == 3
+
+
+def test_readers_share_id_pool(tmp_path):
+    (tmp_path / "calendar.txt").write_text(
+        "service_id,monday,tuesday,wednesday,thursday,friday,saturday,sunday,"
+        "start_date,end_date\n"
+        "S,1,1,1,1,1,0,0,20230101,20231231\n"
+    )
+    (tmp_path / "calendar_dates.txt").write_text(
+        "service_id,date,exception_type\nX,20230102,2\n"
+    )
+    (tmp_path / "trips.txt").write_text("route_id,service_id,trip_id\nR,S,T\nR,S,U\n")
+    (tmp_path / "stop_times.txt").write_text(
+        "trip_id,stop_sequence,arrival_time,departure_time,stop_id,stop_headsign\n"
+        "T,2,10:05:00,10:05:00,B,Nord\n"
+        "T,1,10:00:00,10:00:00,A,Nord\n"
+    )
+    pool = IdPool()
+    calendar = read_calendar(str(tmp_path), id_pool=pool)
+    provider = TripOpDayProvider({}, id_pool=pool)
+    provider.load_directories(str(tmp_path))
+    stop_times = read_stop_times(str(tmp_path), id_pool=pool)
+
+    # headsigns are not ids and are not added to the pool
+    assert list(pool) == ["S", "X", "T", "U", "B", "A"]
+    assert list(calendar) == ["S", "X"]
+    assert next(iter(calendar)) is pool.get_str(0)
+    (stop_times_trip_id,) = stop_times
+    assert stop_times_trip_id is pool.get_str(2)
+
+    provider_trip_id, _ = provider.trip_id_to_opdays
+    assert provider_trip_id is pool.get_str(2)
+    assert provider.has_qualified_opdays("T", lambda d: d.isoweekday() == 1)
+    assert provider.has_qualified_opdays(3, lambda d: d.isoweekday() == 1)
+    with pytest.raises(KeyError):
+        provider.has_qualified_opdays("V", lambda d: True)
+    assert [st.stop_id for st in stop_times["T"]] == ["A", "B"]
+    assert stop_times["T"][0].stop_id is pool.get_str(5)
+    assert stop_times["T"][0].stop_headsign is stop_times["T"][1].stop_headsign
@@ -0,0 +1,112 @@
+import pytest
+
+from pygtfslib.interning import IdPool
+from pygtfslib.mot import (
+    GEOPS_BUS,
+    GEOPS_RAIL,
+    SIMPLE_ROUTE_TYPE_TO_MOT,
+    route_type_to_mot,
+    route_types_to_mots,
+)
+from pygtfslib.routes import (
+    Agency,
+    Route,
+    get_route_id_to_mot,
+    get_route_id_to_time_cache,
+    get_route_id_to_timezone,
+    read_agencies,
+    read_routes,
+)
+
+
+def range_check_route_type_to_mot(route_type, fallback=None):
+    # reference implementation the lookup table replaced
+    if 100 <= route_type <= 117 or route_type == 1503:
+        route_type = 2
+    elif 200 <= route_type <= 209:
+        route_type = 200
+    elif 400 <= route_type <= 405:
+        route_type = 1
+    elif 700 <= route_type <= 716 or route_type in {1500, 1501, 1505, 1506, 1507}:
+        route_type = 3
+    elif 900 <= route_type <= 906:
+        route_type = 0
+    elif route_type in {1000, 1200, 1502}:
+        route_type = 4
+    elif route_type == 1300:
+        route_type = 6
+    elif route_type == 1400:
+        route_type = 7
+    return SIMPLE_ROUTE_TYPE_TO_MOT.get(route_type) or fallback
+
+
+def test_route_type_to_mot_matches_range_checks():
+    route_types = list(range(-50, 6000))
+    float_route_types = [float(rt) for rt in route_types]
+    for values in (route_types, float_route_types):
+        expected = [range_check_route_type_to_mot(rt, "x") for rt in values]
+        assert [route_type_to_mot(rt, "x") for rt in values] == expected
+        assert route_types_to_mots(values, "x") == expected
+    assert route_type_to_mot(float("nan"), "x") == "x"
+    assert route_type_to_mot(3.5) is None
+
+
+def test_route_types_to_mots():
+    assert route_types_to_mots([3, 109, 1702, -1, 5000], fallback="x") == [
+        GEOPS_BUS,
+        GEOPS_RAIL,
+        "x",
+        "x",
+        "x",
+    ]
+    assert route_types_to_mots([700, 9999]) == [GEOPS_BUS, None]
+
+
+def test_read_routes_and_agencies(tmp_path):
+    (tmp_path / "agency.txt").write_text(
+        "agency_id,agency_name,agency_url,agency_timezone\n"
+        "A,Agency A,https://a.example,Europe/Zurich\n"
+        "B,Agency B,https://b.example,America/New_York\n"
+    )
+    (tmp_path / "routes.txt").write_text(
+        "route_id,agency_id,route_short_name,route_type\n"
+        "R1,A,1,3\n"
+        "R2,B,,109\n"
+        "R3,A,3,1300\n"
+    )
+    pool = IdPool()
+    agencies = read_agencies(str(tmp_path), id_pool=pool)
+    routes = read_routes(str(tmp_path), id_pool=pool)
+    assert agencies["A"] == Agency(
+        "A", "Agency A", "https://a.example", "Europe/Zurich", None
+    )
+    assert routes["R2"] == Route("R2", "B", None, None, 109)
+    assert routes["R1"].agency_id is agencies["A"].agency_id
+
+    assert get_route_id_to_mot(routes) == {
+        "R1": GEOPS_BUS,
+        "R2": GEOPS_RAIL,
+        "R3": "gondola",
+    }
+    assert get_route_id_to_timezone(routes, agencies) == {
+        "R1": "Europe/Zurich",
+        "R2": "America/New_York",
+        "R3": "Europe/Zurich",
+    }
+    time_caches = get_route_id_to_time_cache(routes, agencies)
+    assert time_caches["R1"] is time_caches["R3"]
+    assert time_caches["R1"] is not time_caches["R2"]
+
+
+def test_read_routes_duplicate_route_id(tmp_path):
+    (tmp_path / "routes.txt").write_text("route_id,route_type\nR1,3\nR1,2\n")
+    with pytest.raises(ValueError):
+        read_routes(str(tmp_path))
+
+
+def test_get_route_id_to_timezone_without_agency_id():
+    routes = {"R": Route("R", None, None, None, 3)}
+    agency = Agency("", "Agency", "https://example.com", "Europe/Berlin", None)
+    assert get_route_id_to_timezone(routes, {"": agency}) == {"R": "Europe/Berlin"}
+    with pytest.raises(ValueError):
+        get_route_id_to_timezone(routes, {"": agency, "B": agency})
@@ -93,6 +93,25 @@ def test_travel_times():
     assert travel_seconds == [None, None]
 
 
+def test_stop_time_from_values():
+    stop_time = StopTime.from_values(
+        trip_id="T",
+        stop_sequence=3,
+        arrival_time=None,
+        departure_time=datetime.timedelta(hours=10),
+        stop_id="S",
+        stop_headsign=None,
+        pickup_type=0,
+        drop_off_type=1,
+        shape_dist_traveled=12.5,
+        timepoint=1,
+    )
+    # every slot is set
+    assert all(hasattr(stop_time, name) for name in StopTime.__slots__)
+    assert stop_time.arrival_or_departure_time == datetime.timedelta(hours=10)
+    assert stop_time.drop_off_type == 1
+
+
 def test_trip_opday_provider():
     feb_1st = datetime.date(2023, 2, 1)
     feb_2nd = datetime.date(2023, 2, 2)
@@ -118,3 +137,26 @@ def test_trip_opday_provider():
 
     assert provider.get_qualified_opdays("C", is_feb_1st_or_4th) == set()
     assert not provider.has_qualified_opdays("C", is_feb_1st_or_4th)
+
+
+def test_trip_opday_provider_load_directories(tmp_path):
+    (tmp_path / "calendar.txt").write_text(
+        "service_id,monday,tuesday,wednesday,thursday,friday,saturday,sunday,"
+        "start_date,end_date\n"
+        "S1,1,0,0,0,0,0,0,20230101,20230131\n"
+        "S2,0,1,0,0,0,0,0,20230101,20230131\n"
+    )
+    (tmp_path / "trips.txt").write_text(
+        "route_id,service_id,trip_id\nR,S1,A\nR,S1,B\nR,S2,B\nR,S3,C\nR,S1,D\n"
+    )
+    provider = TripOpDayProvider({})
+    provider.load_directories(str(tmp_path))
+    opdays = provider.trip_id_to_opdays
+
+    # trips of the same service share their opdays, unions are copies
+    assert opdays["A"] is opdays["D"]
+    assert opdays["A"] is not opdays["B"]
+    assert len(opdays["A"]) == 5
+    assert len(opdays["B"]) == 10
+    assert opdays["C"] == frozenset()
+    assert isinstance(opdays["A"], frozenset)